@@ -1,16 +1,57 @@
 import json
 import os
 import itertools
+import bisect
+import hashlib
+import numpy as np
 import pandas as pd
 import networkx as nx
+import scipy.linalg
+from scipy.sparse.csgraph import shortest_path
 import plotly.graph_objects as go
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from streamlit.components.v1 import html
 
 DATA_FILE = 'citation_data.json'
 
+# Kamada-Kawai optimizes over the full distance matrix and becomes unusable on
+# large graphs; above these sizes fall back to classical MDS, then random
+KAMADA_KAWAI_MAX_NODES = 500
+MDS_MAX_NODES = 1000
+
+# Past this size traces render with WebGL; below it SVG is fast enough and
+# keeps hover and export behaving the same as before
+WEBGL_MIN_NODES = 500
+
+# Arrow-backed strings let the library filters run Arrow's substring kernels
+STRING_DTYPE = "string[pyarrow]"
+
+# Selectboxes get slow with thousands of options; past this, papers are
+# picked by typing their ID instead
+SELECTBOX_MAX_OPTIONS = 1000
+
+# DOIs per Crossref filter query; longer lists run into URI length limits
+CROSSREF_BATCH_SIZE = 80
+
+# Crossref routes requests that carry a contact address to its faster
+# "polite" pool; set CITAGRAPH_MAILTO to opt in
+CROSSREF_MAILTO = os.environ.get('CITAGRAPH_MAILTO', '')
+
+# (connect, read) seconds per Crossref request, so with retries a stalled
+# connection still gives up instead of holding the rerun
+CROSSREF_TIMEOUT = (5, 30)
+
 # Initialize session state
 if 'selected_node' not in st.session_state:
     st.session_state.selected_node = None
@@ -25,45 +66,84 @@ def handle_node_click(trace, points, state):
         st.rerun()
 
 # ----------------- API Integration -------------------
+@st.cache_resource(show_spinner=False)
+def get_crossref_session():
+    """Shared keep-alive session for Crossref that retries rate limits and server errors"""
+    session = requests.Session()
+    contact = f"; mailto:{CROSSREF_MAILTO}" if CROSSREF_MAILTO else ""
+    session.headers.update({
+        'User-Agent': f'Citagraph/2.0 (https://github.com/poloftus/citagraph-2.0{contact})',
+        'Accept': 'application/json'
+    })
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries))
+    return session
+
+def parse_crossref_work(data, doi):
+    """Extract the fields we store from a Crossref work record"""
+    # Get authors list
+    authors = data.get('author', [])
+    first_author = authors[0].get('family', 'Unknown') if authors else 'Unknown'
+    
+    # Try to identify PI (last author)
+    pi = 'Unknown'
+    if len(authors) > 1:  # If there are multiple authors
+        pi = authors[-1].get('family', 'Unknown')  # Get last author's name
+        
+        # Check for corresponding author if available
+        for author in authors:
+            if author.get('sequence') == 'additional' and author.get('corresponding', False):
+                pi = author.get('family', pi)
+                break
+    
+    return {
+        'title': data.get('title', [''])[0],
+        'author': first_author,
+        'pi': pi,
+        'year': str(data.get('published-print', {}).get('date-parts', [['']])[0][0]),
+        'url': f"https://doi.org/{doi}",
+        'references': [ref.get('DOI', '') for ref in data.get('reference', []) if ref.get('DOI')],
+        'all_authors': [f"{author.get('given', '')} {author.get('family', '')}" for author in authors]
+    }
+
 def fetch_paper_metadata(doi):
     """Fetch paper metadata from Crossref API"""
     try:
-        headers = {'User-Agent': 'Citagraph/1.0 (mailto:your-email@example.com)'}
-        response = requests.get(f'https://api.crossref.org/works/{doi}', headers=headers)
+        response = get_crossref_session().get(f'https://api.crossref.org/works/{doi}', timeout=CROSSREF_TIMEOUT)
         if response.status_code == 200:
-            data = response.json()['message']
-            
-            # Get authors list
-            authors = data.get('author', [])
-            first_author = authors[0].get('family', 'Unknown') if authors else 'Unknown'
-            
-            # Try to identify PI (last author)
-            pi = 'Unknown'
-            if len(authors) > 1:  # If there are multiple authors
-                pi = authors[-1].get('family', 'Unknown')  # Get last author's name
-                
-                # Check for corresponding author if available
-                for author in authors:
-                    if author.get('sequence') == 'additional' and author.get('corresponding', False):
-                        pi = author.get('family', pi)
-                        break
-            
-            return {
-                'title': data.get('title', [''])[0],
-                'author': first_author,
-                'pi': pi,
-                'year': str(data.get('published-print', {}).get('date-parts', [['']])[0][0]),
-                'url': f"https://doi.org/{doi}",
-                'references': [ref.get('DOI', '') for ref in data.get('reference', []) if ref.get('DOI')],
-                'all_authors': [f"{author.get('given', '')} {author.get('family', '')}" for author in authors]
-            }
+            return parse_crossref_work(loads_json(response.content)['message'], doi)
     except Exception as e:
         st.error(f"Error fetching metadata: {str(e)}")
     return None
 
-def add_paper_with_references(graph, display_names, paper_info, paper_links, doi):
+def fetch_paper_metadata_batch(dois):
+    """Fetch metadata for several DOIs with one Crossref filter query per chunk"""
+    metadata = {}
+    session = get_crossref_session()
+    # Crossref matches DOIs case-insensitively; map results back to the input spelling
+    requested = {doi.lower(): doi for doi in dois}
+    dois = list(requested.values())
+    for start in range(0, len(dois), CROSSREF_BATCH_SIZE):
+        chunk = dois[start:start + CROSSREF_BATCH_SIZE]
+        try:
+            response = session.get(
+                'https://api.crossref.org/works',
+                params={'filter': ','.join(f'doi:{doi}' for doi in chunk), 'rows': len(chunk)},
+                timeout=CROSSREF_TIMEOUT
+            )
+            if response.status_code == 200:
+                for item in loads_json(response.content)['message'].get('items', []):
+                    doi = requested.get(item.get('DOI', '').lower())
+                    if doi:
+                        metadata[doi] = parse_crossref_work(item, doi)
+        except Exception as e:
+            st.error(f"Error fetching metadata: {str(e)}")
+    return metadata
+
+def add_paper_with_references(graph, display_names, paper_info, paper_links, doi, metadata=None):
     """Add a paper and connect it to existing papers in our library that it cites"""
-    metadata = fetch_paper_metadata(doi)
+    if metadata is None:
+        metadata = fetch_paper_metadata(doi)
     if metadata:
         # Add the main paper
         paper_id = doi
@@ -85,18 +165,15 @@ def add_paper_with_references(graph, display_names, paper_info, paper_links, doi
         st.info(f"All Authors: {', '.join(metadata.get('all_authors', []))}")
         
         # Allow user to correct PI if needed
-        corrected_pi = st.text_input("Correct PI if needed:", value=metadata['pi'])
+        corrected_pi = st.text_input("Correct PI if needed:", value=metadata['pi'], key=f"correct_pi_{paper_id}")
         if corrected_pi != metadata['pi']:
             paper_info[paper_id]['pi'] = corrected_pi
         
-        # Check references against existing papers and add connections
-        existing_papers = set(graph.nodes())
-        citations_found = 0
-        
-        for ref_doi in metadata['references']:
-            if ref_doi in existing_papers:
-                graph.add_edge(paper_id, ref_doi)
-                citations_found += 1
+        # Check references against existing papers and add connections; the
+        # node view is set-like, so this only probes the graph per reference
+        cited_papers = graph.nodes & set(metadata['references'])
+        graph.add_edges_from((paper_id, ref_doi) for ref_doi in cited_papers)
+        citations_found = len(cited_papers)
         
         if citations_found > 0:
             st.info(f"Found {citations_found} citation{'s' if citations_found > 1 else ''} to existing papers in the library")
@@ -107,60 +184,177 @@ def add_paper_with_references(graph, display_names, paper_info, paper_links, doi
     return None
 
 # ----------------- Graph Loading & Saving -------------------
+def loads_json(content):
+    """Parse JSON bytes, using orjson when it is installed"""
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+def read_json(filename):
+    """Parse a JSON file, using orjson when it is installed"""
+    with open(filename, 'rb') as f:
+        return loads_json(f.read())
+
+def write_json(data, filename):
+    """Write data as indented JSON, using orjson when it is installed.
+
+    The file is written next to the target and swapped in with os.replace, so
+    a crash mid-write never leaves a truncated library behind.
+    """
+    tmp_filename = filename + '.tmp'
+    if orjson is not None:
+        with open(tmp_filename, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp_filename, 'w') as f:
+            json.dump(data, f, indent=2)
+    os.replace(tmp_filename, filename)
+
+def get_file_mtime(filename):
+    return os.path.getmtime(filename) if os.path.exists(filename) else None
+
 def load_graph_from_json(filename):
     graph = nx.DiGraph()
-    display_names = {}
-    paper_info = {}
-    paper_links = {}
-    if os.path.exists(filename):
-        with open(filename, 'r') as f:
-            data = json.load(f)
-            for paper_id, info in data.get('papers', {}).items():
-                graph.add_node(paper_id)
-                display_names[paper_id] = info.get('title', paper_id)
-                paper_info[paper_id] = {
-                    'author': info.get('author', 'Unknown'),
-                    'pi': info.get('pi', 'Unknown'),
-                    'year': info.get('year', 'Unknown')
-                }
-                paper_links[paper_id] = info.get('url', '')
-            for paper_id, cited_ids in data.get('citations', {}).items():
-                for cited_id in cited_ids:
-                    graph.add_edge(paper_id, cited_id)
+    data = read_json(filename) if os.path.exists(filename) else {}
+    papers = data.get('papers', {})
+    display_names = {paper_id: info.get('title', paper_id) for paper_id, info in papers.items()}
+    paper_info = {
+        paper_id: {
+            'author': info.get('author', 'Unknown'),
+            'pi': info.get('pi', 'Unknown'),
+            'year': info.get('year', 'Unknown')
+        }
+        for paper_id, info in papers.items()
+    }
+    paper_links = {paper_id: info.get('url', '') for paper_id, info in papers.items()}
+    # Papers go in first so isolated ones are kept, then all citations at once
+    graph.add_nodes_from(papers)
+    graph.add_edges_from(
+        (paper_id, cited_id)
+        for paper_id, cited_ids in data.get('citations', {}).items()
+        for cited_id in cited_ids
+    )
     return graph, display_names, paper_info, paper_links
 
-def save_graph_to_json(graph, display_names, paper_info, paper_links, filename):
-    data = {'papers': {}, 'citations': {}}
-    for node in graph.nodes():
-        data['papers'][node] = {
-            'title': display_names[node],
-            'author': paper_info[node]['author'],
-            'pi': paper_info[node]['pi'],
-            'year': paper_info[node]['year'],
-            'url': paper_links[node]
+def graph_to_json_data(graph, display_names, paper_info, paper_links):
+    """Snapshot the graph as the JSON file's structure, sharing no mutable parts with it"""
+    return {
+        'papers': {
+            node: {
+                'title': display_names[node],
+                'author': paper_info[node]['author'],
+                'pi': paper_info[node]['pi'],
+                'year': paper_info[node]['year'],
+                'url': paper_links[node]
+            }
+            for node in graph.nodes()
+        },
+        # adjacency() yields each node's successor dict directly
+        'citations': {node: list(cited) for node, cited in graph.adjacency()}
+    }
+
+@st.cache_resource(show_spinner=False)
+def get_save_executor():
+    # A single worker runs the writes one at a time, in the order requested
+    return ThreadPoolExecutor(max_workers=1)
+
+def save_graph_state(state, filename):
+    """Snapshot the graph now and write it to disk in the background.
+
+    Building the snapshot is a pass over memory; the serialization and the
+    disk write, which grow with the library, happen off the rerun.
+    """
+    with state['lock']:
+        data = graph_to_json_data(state['graph'], state['display_names'], state['paper_info'], state['paper_links'])
+        state['dirty'] = False
+
+        def write():
+            write_json(data, filename)
+            with state['lock']:
+                state['mtime'] = get_file_mtime(filename)
+
+        state['pending_save'] = get_save_executor().submit(write)
+
+def load_graph_state(state, filename):
+    """Fill the graph state from disk, replacing whatever it held; callers hold the lock"""
+    # Read the mtime first so a write racing the load is picked up next time
+    state['mtime'] = get_file_mtime(filename)
+    state['graph'], state['display_names'], state['paper_info'], state['paper_links'] = load_graph_from_json(filename)
+    state['dirty'] = False
+    state['pending_save'] = None
+    state['version'] = state.get('version', 0) + 1
+    return state
+
+@st.cache_resource(show_spinner=False)
+def get_graph_state(filename):
+    """The live library, held once per process and shared by every session.
+
+    Sessions run in their own threads, so 'lock' guards every change. The
+    graph and dicts are never mutated once published: edits go through
+    edit_graph_state, which swaps in edited copies, so a session rendering
+    the previous objects keeps a consistent view without holding the lock.
+    'version' moves on every edit or reload and keys the per-session caches.
+    """
+    return load_graph_state({'lock': threading.Lock()}, filename)
+
+def read_graph_state(state):
+    """The current graph, its dicts and their version, taken together"""
+    with state['lock']:
+        return state['graph'], state['display_names'], state['paper_info'], state['paper_links'], state['version']
+
+@contextmanager
+def edit_graph_state(state):
+    """Edit copies of the shared library under its lock, then publish them.
+
+    Copying costs a pass over the library per edit, but edits are rare next
+    to the reruns that read it. Call mark_dirty inside the block for edits
+    that change anything; an exception discards the copies.
+    """
+    with state['lock']:
+        edit = {
+            'graph': state['graph'].copy(),
+            'display_names': dict(state['display_names']),
+            'paper_info': {paper_id: dict(info) for paper_id, info in state['paper_info'].items()},
+            'paper_links': dict(state['paper_links'])
         }
-        data['citations'][node] = list(graph.successors(node))
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
+        yield edit
+        state.update(edit)
+
+def mark_dirty(state):
+    """Flag in-memory edits that have not been written to disk yet"""
+    state['dirty'] = True
+    state['version'] += 1
 
 # ----------------- Color Mapping -------------------
-def get_decade_color(year):
-    try:
-        decade = (int(year) // 10) * 10
-        # Rainbow progression from red (oldest) to violet (newest)
-        color_map = {
-            1960: 'rgb(255, 0, 0)',      # Red
-            1970: 'rgb(255, 127, 0)',    # Orange
-            1980: 'rgb(255, 255, 0)',    # Yellow
-            1990: 'rgb(0, 255, 0)',      # Green
-            2000: 'rgb(0, 0, 255)',      # Blue
-            2010: 'rgb(75, 0, 130)',     # Indigo
-            2020: 'rgb(148, 0, 211)',    # Violet
-            2030: 'rgb(200, 0, 255)'     # Future papers (purple)
-        }
-        return color_map.get(decade, 'rgb(128, 128, 128)')  # Gray for unknown decades
-    except:
-        return 'rgb(128, 128, 128)'  # Gray for invalid years
+# Rainbow progression from red (oldest) to violet (newest)
+DECADE_COLORS = {
+    1960: 'rgb(255, 0, 0)',      # Red
+    1970: 'rgb(255, 127, 0)',    # Orange
+    1980: 'rgb(255, 255, 0)',    # Yellow
+    1990: 'rgb(0, 255, 0)',      # Green
+    2000: 'rgb(0, 0, 255)',      # Blue
+    2010: 'rgb(75, 0, 130)',     # Indigo
+    2020: 'rgb(148, 0, 211)',    # Violet
+    2030: 'rgb(200, 0, 255)'     # Future papers (purple)
+}
+UNKNOWN_COLOR = 'rgb(128, 128, 128)'  # Gray for unknown decades and invalid years
+
+# Decade colors as an array indexed by (decade - FIRST_DECADE) // 10
+FIRST_DECADE = min(DECADE_COLORS)
+DECADE_COLOR_ARRAY = np.array([DECADE_COLORS[decade] for decade in sorted(DECADE_COLORS)])
+
+def get_decades(years):
+    """Decade start for each year as nullable integers; invalid years become <NA>."""
+    years = pd.to_numeric(pd.Series(years), errors='coerce')
+    # Bound years first: values past int64 would make the Int64 cast raise
+    return (years.where((years >= 0) & (years < 10000)) // 10 * 10).astype('Int64')
+
+def get_decade_labels(decades):
+    return (decades.astype(str) + "s").where(decades.notna(), "Unknown")
+
+def get_decade_colors(decades):
+    rows = ((decades - FIRST_DECADE) // 10).fillna(-1).to_numpy(dtype=np.int64)
+    known = (rows >= 0) & (rows < len(DECADE_COLOR_ARRAY))
+    colors = np.where(known, DECADE_COLOR_ARRAY[np.where(known, rows, 0)], UNKNOWN_COLOR)
+    return pd.Series(colors, index=decades.index)
 
 # Define a list of distinct colors for authors
 AUTHOR_COLORS = [
@@ -186,78 +380,93 @@ AUTHOR_COLORS = [
     'rgb(199, 21, 133)'    # Medium Violet Red
 ]
 
-def get_author_color(author, color_map):
-    """Assign a unique color to each author"""
-    if author not in color_map:
-        # Get all currently used colors
-        used_colors = set(color_map.values())
-        # Find the first available color that hasn't been used
-        for color in AUTHOR_COLORS:
-            if color not in used_colors:
-                color_map[author] = color
-                return color
-        # If all colors are used, create a slightly modified version of an existing color
-        base_color = AUTHOR_COLORS[len(color_map) % len(AUTHOR_COLORS)]
-        rgb_values = [int(x) for x in base_color[4:-1].split(',')]
-        # Modify the RGB values slightly
-        modified_rgb = [
-            (v + 30 * (len(color_map) // len(AUTHOR_COLORS))) % 256 
-            for v in rgb_values
-        ]
-        color_map[author] = f'rgb({modified_rgb[0]}, {modified_rgb[1]}, {modified_rgb[2]})'
-    return color_map[author]
+def get_author_color(author):
+    """Pick an author's color from a hash of the name, stable across reruns and sessions"""
+    # md5 rather than hash(), which is salted per interpreter process
+    digest = hashlib.md5(str(author).encode('utf-8')).digest()
+    return AUTHOR_COLORS[int.from_bytes(digest[:8], 'big') % len(AUTHOR_COLORS)]
 
 # ----------------- Graph Plotting -------------------
-def draw_graph_plotly(graph, display_names, paper_info, layout_choice, color_mode):
-    # Store the selected node in session state if it doesn't exist
-    if 'selected_node' not in st.session_state:
-        st.session_state.selected_node = None
-
-    # Determine the layout for graph plotting
+def mds_layout(graph):
+    """Classical MDS on shortest-path distances, a closed-form stand-in for Kamada-Kawai"""
+    nodes = list(graph.nodes())
+    n = len(nodes)
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=nodes, format='csr')
+    dist = shortest_path(adjacency, directed=False, unweighted=True)
+    # Place disconnected pairs just beyond the farthest connected pair
+    finite = np.isfinite(dist)
+    dist[~finite] = dist[finite].max() + 1
+    centering = np.eye(n) - 1.0 / n
+    gram = -0.5 * centering @ (dist ** 2) @ centering
+    eigvals, eigvecs = scipy.linalg.eigh(gram, subset_by_index=[n - 2, n - 1])
+    coords = nx.rescale_layout(eigvecs * np.sqrt(np.maximum(eigvals, 0)))
+    return dict(zip(nodes, coords))
+
+@st.cache_data(show_spinner=False)
+def compute_layout(nodes, edges, layout_choice):
+    # Takes the topology as plain tuples so the cache key is the graph
+    # itself; seeds keep cached and recomputed positions identical
+    graph = nx.DiGraph()
+    graph.add_nodes_from(nodes)
+    graph.add_edges_from(edges)
+    # From 500 nodes, NetworkX 3.5+ defaults to minimizing the
+    # Fruchterman-Reingold energy with L-BFGS instead of iterating forces
     if layout_choice == "spring":
         pos = nx.spring_layout(graph, seed=42)
     elif layout_choice == "circular":
         pos = nx.circular_layout(graph)
     elif layout_choice == "kamada-kawai":
-        pos = nx.kamada_kawai_layout(graph)
+        if graph.number_of_nodes() > MDS_MAX_NODES:
+            pos = nx.random_layout(graph, seed=42)
+        elif graph.number_of_nodes() > KAMADA_KAWAI_MAX_NODES:
+            pos = mds_layout(graph)
+        else:
+            pos = nx.kamada_kawai_layout(graph)
     elif layout_choice == "random":
-        pos = nx.random_layout(graph)
+        pos = nx.random_layout(graph, seed=42)
     elif layout_choice == "fruchterman-reingold":
-        pos = nx.fruchterman_reingold_layout(graph)
+        pos = nx.fruchterman_reingold_layout(graph, seed=42)
     else:
         pos = nx.spring_layout(graph, seed=42)
+    return {node: (float(x), float(y)) for node, (x, y) in pos.items()}
 
-    color_groups = {}
-    color_map = {}
-
-    if color_mode == "First Author":
-        if 'first_author_colors' not in st.session_state:
-            st.session_state.first_author_colors = {}
-        color_map = st.session_state.first_author_colors
-    elif color_mode == "Principal Investigator":
-        if 'pi_colors' not in st.session_state:
-            st.session_state.pi_colors = {}
-        color_map = st.session_state.pi_colors
-
-    # Get connected nodes if there's a selection
-    connected_nodes = set()
-    if st.session_state.selected_node:
-        connected_nodes = set(graph.successors(st.session_state.selected_node)) | set(graph.predecessors(st.session_state.selected_node))
-        connected_nodes.add(st.session_state.selected_node)
-
+def render_graph_plotly(graph, pos, display_names, paper_info, color_mode):
     # Create edges with different colors based on selection
     edge_traces = []
+
+    # WebGL traces only pay off once there are enough marks to slow down SVG
+    ScatterCls = go.Scattergl if graph.number_of_nodes() > WEBGL_MIN_NODES else go.Scatter
     
+    # Position rows per node so coordinates can be gathered in bulk; node
+    # traces follow the same order, so no per-node pos lookups are needed.
+    # float32 is ample for screen coordinates and halves the plot payload
+    nodes = list(graph.nodes())
+    node_index = {node: i for i, node in enumerate(nodes)}
+    pos_arr = np.fromiter(
+        (coord for node in nodes for coord in pos[node]), dtype=np.float32
+    ).reshape(-1, 2)
+
+    # Edges as (source row, target row) pairs, built once for all edge traces
+    edges_arr = np.fromiter(
+        (node_index[node] for edge in graph.edges() for node in edge), dtype=np.int32
+    ).reshape(-1, 2)
+
     # Function to create edge trace
-    def create_edge_trace(edges, color, width):
-        edge_x, edge_y = [], []
-        for src, dst in edges:
-            x0, y0 = pos[src]
-            x1, y1 = pos[dst]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
-        
-        return go.Scatter(
+    def create_edge_trace(edges_arr, color, width):
+        src_xy = pos_arr[edges_arr[:, 0]]
+        dst_xy = pos_arr[edges_arr[:, 1]]
+
+        # Each edge contributes (start, end, NaN); the NaN breaks the line
+        edge_x = np.empty(3 * len(edges_arr), dtype=np.float32)
+        edge_x[0::3] = src_xy[:, 0]
+        edge_x[1::3] = dst_xy[:, 0]
+        edge_x[2::3] = np.nan
+        edge_y = np.empty(3 * len(edges_arr), dtype=np.float32)
+        edge_y[0::3] = src_xy[:, 1]
+        edge_y[1::3] = dst_xy[:, 1]
+        edge_y[2::3] = np.nan
+
+        return ScatterCls(
             x=edge_x, y=edge_y,
             line=dict(width=width, color=color),
             hoverinfo='none',
@@ -265,164 +474,106 @@ def draw_graph_plotly(graph, display_names, paper_info, layout_choice, color_mod
             showlegend=False
         )
 
-    # Split edges into highlighted and non-highlighted
+    # Split edges into highlighted and non-highlighted with a single mask
     if st.session_state.selected_node:
-        highlighted_edges = [(u, v) for u, v in graph.edges() 
-                           if u == st.session_state.selected_node or v == st.session_state.selected_node]
-        normal_edges = [(u, v) for u, v in graph.edges() 
-                       if u != st.session_state.selected_node and v != st.session_state.selected_node]
+        selected_row = node_index.get(st.session_state.selected_node, -1)
+        is_highlighted = (edges_arr == selected_row).any(axis=1)
+        highlighted_edges = edges_arr[is_highlighted]
+        normal_edges = edges_arr[~is_highlighted]
+        # The highlighted edges' endpoints are exactly the selection and its
+        # neighbors, so the edge array doubles as the adjacency lookup
+        is_connected = np.zeros(len(nodes), dtype=bool)
+        is_connected[highlighted_edges.ravel()] = True
         
         # Add normal edges (thinner, lighter)
-        if normal_edges:
+        if len(normal_edges):
             edge_traces.append(create_edge_trace(normal_edges, 'rgba(180,180,180,0.2)', 1))
         
         # Add highlighted edges (thicker, darker)
-        if highlighted_edges:
+        if len(highlighted_edges):
             edge_traces.append(create_edge_trace(highlighted_edges, 'rgba(50,50,50,0.8)', 2))
     else:
         # If no node is selected, show all edges normally
-        edge_traces.append(create_edge_trace(graph.edges(), 'rgba(128,128,128,0.6)', 1))
+        edge_traces.append(create_edge_trace(edges_arr, 'rgba(128,128,128,0.6)', 1))
+
+    # Node attributes as columns, one row per node in trace order, so the
+    # per-node values below come from array operations instead of dict lookups
+    node_df = (
+        pd.DataFrame.from_dict(paper_info, orient='index', columns=['author', 'pi', 'year'])
+        .reindex(nodes)
+        .fillna('Unknown')
+    )
+    node_df['title'] = [display_names.get(node, node) for node in nodes]
 
-    # Create node traces with customdata for click events
-    node_traces = []
-    
-    # For decade mode, create traces in chronological order
     if color_mode == "Decade":
-        # Create a dictionary to store nodes by decade
-        decade_groups = {}
-        for node in graph.nodes():
-            year = paper_info.get(node, {}).get('year', 'Unknown')
-            try:
-                decade = (int(year) // 10) * 10
-                label = f"{decade}s"
-            except:
-                decade = float('inf')  # Put unknown at the end
-                label = "Unknown"
-            
-            if label not in decade_groups:
-                decade_groups[label] = {
-                    'x': [], 'y': [], 'text': [], 'color': get_decade_color(year),
-                    'size': [], 'opacity': [], 'customdata': []
-                }
-            
-            x, y = pos[node]
-            title = display_names.get(node, node)
-            first_author = paper_info.get(node, {}).get('author', 'Unknown')
-            pi = paper_info.get(node, {}).get('pi', 'Unknown')
-            
-            # Create hover text with just first author and PI information
-            text = f"{title}<br>First Author: {first_author}<br>PI: {pi}<br>Year: {year}<br><b>Paper ID:</b> {node}"
-            
-            # Adjust node size and opacity based on selection
-            size = 12
-            opacity = 1.0
-            if st.session_state.selected_node:
-                if node == st.session_state.selected_node:
-                    size = 20  # Make selected node larger
-                    opacity = 1.0
-                elif node in connected_nodes:
-                    size = 16  # Make connected nodes slightly larger
-                    opacity = 0.9
-                else:
-                    size = 12  # Keep normal size for unconnected nodes
-                    opacity = 0.3  # Make unconnected nodes slightly transparent
-            
-            decade_groups[label]['x'].append(x)
-            decade_groups[label]['y'].append(y)
-            decade_groups[label]['text'].append(text)
-            decade_groups[label]['size'].append(size)
-            decade_groups[label]['opacity'].append(opacity)
-            decade_groups[label]['customdata'].append(node)
-        
-        # Add traces in chronological order
-        sorted_decades = sorted([d for d in decade_groups.keys() if d != "Unknown"])
-        if "Unknown" in decade_groups:
-            sorted_decades.append("Unknown")
-        
-        for decade in sorted_decades:
-            group = decade_groups[decade]
-            node_trace = go.Scatter(
-                x=group['x'], y=group['y'],
-                mode='markers',
-                hoverinfo='text',
-                text=group['text'],
-                customdata=group['customdata'],
-                marker=dict(
-                    color=group['color'],
-                    size=group['size'],
-                    opacity=group['opacity'],
-                    line=dict(width=2, color='DarkSlateGrey')
-                ),
-                name=decade
-            )
-            node_traces.append(node_trace)
-    
+        decades = get_decades(node_df['year'])
+        label_col = get_decade_labels(decades)
+        color_col = get_decade_colors(decades)
     else:  # First Author or PI mode
-        for node in graph.nodes():
-            first_author = paper_info.get(node, {}).get('author', 'Unknown')
-            pi = paper_info.get(node, {}).get('pi', 'Unknown')
-            year = paper_info.get(node, {}).get('year', 'Unknown')
-            
-            if color_mode == "First Author":
-                label = first_author
-                color = get_author_color(first_author, color_map)
-            else:  # Principal Investigator mode
-                label = pi
-                color = get_author_color(pi, color_map)
-
-            if label not in color_groups:
-                color_groups[label] = {
-                    'x': [], 'y': [], 'text': [], 'color': color,
-                    'size': [], 'opacity': [], 'customdata': []
-                }
-
-            x, y = pos[node]
-            title = display_names.get(node, node)
-            
-            # Create hover text with just first author and PI information
-            text = f"{title}<br>First Author: {first_author}<br>PI: {pi}<br>Year: {year}<br><b>Paper ID:</b> {node}"
-            
-            # Adjust node size and opacity based on selection
-            size = 12
-            opacity = 1.0
-            if st.session_state.selected_node:
-                if node == st.session_state.selected_node:
-                    size = 20  # Make selected node larger
-                    opacity = 1.0
-                elif node in connected_nodes:
-                    size = 16  # Make connected nodes slightly larger
-                    opacity = 0.9
-                else:
-                    size = 12  # Keep normal size for unconnected nodes
-                    opacity = 0.3  # Make unconnected nodes slightly transparent
-            
-            color_groups[label]['x'].append(x)
-            color_groups[label]['y'].append(y)
-            color_groups[label]['text'].append(text)
-            color_groups[label]['size'].append(size)
-            color_groups[label]['opacity'].append(opacity)
-            color_groups[label]['customdata'].append(node)
-
-        # Create node traces for author/PI mode
-        for label, group in color_groups.items():
-            node_trace = go.Scatter(
-                x=group['x'], y=group['y'],
-                mode='markers',
-                hoverinfo='text',
-                text=group['text'],
-                customdata=group['customdata'],
-                marker=dict(
-                    color=group['color'],
-                    size=group['size'],
-                    opacity=group['opacity'],
-                    line=dict(width=2, color='DarkSlateGrey')
-                ),
-                name=label
-            )
-            node_traces.append(node_trace)
+        label_col = node_df['author' if color_mode == "First Author" else 'pi']
+        color_col = label_col.map({label: get_author_color(label) for label in label_col.unique()})
+
+    # Legend entries in order of first appearance
+    first_seen = ~label_col.duplicated()
+    labels = label_col[first_seen].tolist()
+    legend_colors = dict(zip(labels, color_col[first_seen]))
+
+    # Create hover text with just first author and PI information, joined
+    # column-wise rather than formatted node by node
+    texts = (
+        node_df['title'].astype(str)
+        + '<br>First Author: ' + node_df['author'].astype(str)
+        + '<br>PI: ' + node_df['pi'].astype(str)
+        + '<br>Year: ' + node_df['year'].astype(str)
+        + '<br><b>Paper ID:</b> ' + node_df.index.astype(str)
+    ).tolist()
+
+    # Adjust node size and opacity based on selection
+    if st.session_state.selected_node:
+        is_selected = node_df.index == st.session_state.selected_node
+        # Selected node largest, its neighbors slightly larger, the rest faded
+        sizes = np.where(is_selected, 20, np.where(is_connected, 16, 12))
+        opacities = np.where(is_selected, 1.0, np.where(is_connected, 0.9, 0.3))
+    else:
+        sizes = np.full(len(nodes), 12)
+        opacities = np.full(len(nodes), 1.0)
+
+    node_trace = ScatterCls(
+        x=pos_arr[:, 0], y=pos_arr[:, 1],
+        mode='markers',
+        hoverinfo='text',
+        text=texts,
+        customdata=nodes,
+        marker=dict(
+            color=color_col.tolist(),
+            size=sizes,
+            opacity=opacities,
+            line=dict(width=2, color='DarkSlateGrey')
+        ),
+        showlegend=False
+    )
+
+    # For decade mode, list legend entries in chronological order
+    if color_mode == "Decade":
+        labels = sorted([d for d in labels if d != "Unknown"])
+        if "Unknown" in legend_colors:
+            labels.append("Unknown")
+
+    # Empty proxy traces carry the legend entries without adding markers
+    legend_traces = [
+        ScatterCls(
+            x=[None], y=[None],
+            mode='markers',
+            hoverinfo='none',
+            marker=dict(color=legend_colors[label], size=12, line=dict(width=2, color='DarkSlateGrey')),
+            name=label,
+            showlegend=True
+        )
+        for label in labels
+    ]
 
     # Create the figure with all traces
-    fig = go.Figure(data=edge_traces + node_traces)
+    fig = go.Figure(data=edge_traces + [node_trace] + legend_traces)
 
     # Update layout with click event handling
     fig.update_layout(
@@ -440,13 +591,88 @@ def draw_graph_plotly(graph, display_names, paper_info, layout_choice, color_mod
             font=dict(size=14, color='black', family='Times New Roman'),
             bgcolor='white',
             bordercolor='black',
-            borderwidth=1
+            borderwidth=1,
+            # Entries are marker-less proxies, so toggling them would hide nothing
+            itemclick=False,
+            itemdoubleclick=False
         ),
         dragmode='pan'  # Make it easier to click nodes
     )
 
     return fig
 
+def draw_graph_plotly(graph, display_names, paper_info, layout_choice, color_mode, graph_version):
+    # Store the selected node in session state if it doesn't exist
+    if 'selected_node' not in st.session_state:
+        st.session_state.selected_node = None
+
+    # Reuse the last figure while the graph data, layout, coloring and
+    # selection are unchanged; graph_version moves on every edit or reload
+    fig_key = (graph_version, layout_choice, color_mode, st.session_state.selected_node)
+    cached = st.session_state.get('graph_figure')
+    if cached is not None and cached[0] == fig_key:
+        return cached[1]
+
+    # Positions do not depend on coloring, so a color change only re-renders
+    pos = compute_layout(tuple(sorted(graph.nodes())), tuple(sorted(graph.edges())), layout_choice)
+    fig = render_graph_plotly(graph, pos, display_names, paper_info, color_mode)
+    st.session_state.graph_figure = (fig_key, fig)
+    return fig
+
+# ----------------- Paper Tables -------------------
+def build_papers_df(paper_ids, display_names, paper_info, paper_links):
+    """Build the paper table in one constructor call with Arrow string columns"""
+    paper_ids = list(paper_ids)
+    infos = [paper_info.get(paper_id, {}) for paper_id in paper_ids]
+    return pd.DataFrame({
+        "DOI": paper_ids,
+        "Title": [display_names.get(paper_id, "Unknown") for paper_id in paper_ids],
+        "1st Author": [info.get('author', "Unknown") for info in infos],
+        "PI": [info.get('pi', "Unknown") for info in infos],
+        "Year": [info.get('year', "Unknown") for info in infos],
+        "Link": [paper_links.get(paper_id) or None for paper_id in paper_ids]
+    }, dtype=STRING_DTYPE)
+
+def filter_papers(df, filters):
+    """Keep rows whose columns contain every non-empty query as plain text, in a single pass"""
+    mask = np.ones(len(df), dtype=bool)
+    for column, query in filters.items():
+        if query:
+            mask &= df[column].str.contains(query, case=False, na=False, regex=False).to_numpy(dtype=bool)
+    return df[mask]
+
+def display_paper_table(df):
+    """Show papers in Streamlit's virtualized grid with clickable links"""
+    st.dataframe(
+        df,
+        column_config={"Link": st.column_config.LinkColumn("Link", display_text="Link")},
+        hide_index=True,
+        use_container_width=True
+    )
+
+# ----------------- Paper Selection -------------------
+def get_node_list(graph, graph_version):
+    """Sorted paper IDs for the selection widgets, rebuilt only when the graph changes"""
+    cached = st.session_state.get('node_list')
+    if cached is None or cached[0] != graph_version:
+        cached = (graph_version, sorted(graph.nodes()))
+        st.session_state.node_list = cached
+    return cached[1]
+
+def select_paper(label, node_list, format_func=str):
+    """Pick a paper from a selectbox, or by typed ID when there are too many to list"""
+    if len(node_list) <= SELECTBOX_MAX_OPTIONS:
+        return st.selectbox(label, node_list, format_func=format_func)
+    paper_id = st.text_input(f"{label} (Paper ID)").strip()
+    if not paper_id:
+        return None
+    # node_list is sorted, so membership is a binary search
+    i = bisect.bisect_left(node_list, paper_id)
+    if i == len(node_list) or node_list[i] != paper_id:
+        st.warning(f"No paper with ID {paper_id}")
+        return None
+    return paper_id
+
 # ----------------- Streamlit UI -------------------
 st.set_page_config(layout='wide')
 st.title("Citagraph4")
@@ -455,8 +681,23 @@ st.title("Citagraph4")
 if 'clicked_node' not in st.session_state:
     st.session_state.clicked_node = None
 
-# Load Graph Data
-graph, display_names, paper_info, paper_links = load_graph_from_json(DATA_FILE)
+# Load Graph Data once per process and again only when the file changes on
+# disk; unsaved edits in the shared copy take precedence over the file
+data_mtime = get_file_mtime(DATA_FILE)
+graph_state = get_graph_state(DATA_FILE)
+with graph_state['lock']:
+    pending_save = graph_state['pending_save']
+    if pending_save is not None and pending_save.done():
+        graph_state['pending_save'] = None
+        if pending_save.exception() is not None:
+            # The snapshot never reached the file, so the edits are unsaved again
+            graph_state['dirty'] = True
+            st.error(f"Saving to disk failed: {pending_save.exception()}")
+    elif pending_save is None and not graph_state['dirty'] and graph_state['mtime'] != data_mtime:
+        load_graph_state(graph_state, DATA_FILE)
+# This run renders these objects; other sessions' edits replace them in the
+# shared state rather than changing them, so they stay consistent
+graph, display_names, paper_info, paper_links, graph_version = read_graph_state(graph_state)
 
 # Sidebar Controls
 with st.sidebar:
@@ -464,46 +705,88 @@ with st.sidebar:
     
     # Auto-Add Paper with Citations
     with st.expander("Auto-Add Paper with Citations", expanded=True):
-        paper_doi = st.text_input("Enter Paper DOI")
+        # DOIs are case-insensitive; keep one spelling per paper, as the batch fetch does
+        paper_dois = list({
+            doi.lower(): doi for doi in st.text_area("Enter Paper DOI(s), one per line").split()
+        }.values())
         if st.button("Fetch and Add Paper"):
-            if paper_doi:
+            if paper_dois:
                 with st.spinner('Fetching paper data...'):
-                    if add_paper_with_references(graph, display_names, paper_info, paper_links, paper_doi):
-                        save_graph_to_json(graph, display_names, paper_info, paper_links, DATA_FILE)
-                        st.success("Paper and its citations added successfully!")
+                    # Several DOIs are fetched together; any the batch misses are retried
+                    # singly. Fetching happens before taking the lock, so other
+                    # sessions are not held up by Crossref
+                    prefetched = fetch_paper_metadata_batch(paper_dois) if len(paper_dois) > 1 else {}
+                    metadata = {doi: prefetched.get(doi) or fetch_paper_metadata(doi) for doi in paper_dois}
+                    with edit_graph_state(graph_state) as edit:
+                        failed = [
+                            doi for doi in paper_dois
+                            if not metadata[doi] or not add_paper_with_references(
+                                edit['graph'], edit['display_names'], edit['paper_info'], edit['paper_links'],
+                                doi, metadata[doi])
+                        ]
+                        if len(failed) < len(paper_dois):
+                            mark_dirty(graph_state)
+                    if len(failed) < len(paper_dois):
+                        compute_layout.clear()
+                        graph, display_names, paper_info, paper_links, graph_version = read_graph_state(graph_state)
+                    if not failed:
+                        st.success("Paper and its citations added; use \"Save to Disk\" to keep them")
                     else:
-                        st.error("Failed to fetch paper data. Please check the DOI and try again.")
+                        st.error(f"Failed to fetch paper data for {', '.join(failed)}. Please check the DOI and try again.")
             else:
                 st.warning("Please enter a DOI")
 
     # Edit/Delete Paper
     with st.expander("Edit/Delete Paper", expanded=False):
         if graph.number_of_nodes() > 0:
-            selected_id = st.selectbox("Select Paper", list(graph.nodes))
+            selected_id = select_paper("Select Paper", get_node_list(graph, graph_version))
             if selected_id:
-                display_names[selected_id] = st.text_input("Edit Title", value=display_names[selected_id])
-                paper_info[selected_id]['author'] = st.text_input("Edit First Author", value=paper_info[selected_id]['author'])
-                paper_info[selected_id]['pi'] = st.text_input("Edit PI", value=paper_info[selected_id].get('pi', 'Unknown'))
-                paper_info[selected_id]['year'] = st.text_input("Edit Year", value=paper_info[selected_id]['year'])
-                paper_links[selected_id] = st.text_input("Edit URL", value=paper_links[selected_id])
+                new_title = st.text_input("Edit Title", value=display_names[selected_id])
+                new_author = st.text_input("Edit First Author", value=paper_info[selected_id]['author'])
+                new_pi = st.text_input("Edit PI", value=paper_info[selected_id].get('pi', 'Unknown'))
+                new_year = st.text_input("Edit Year", value=paper_info[selected_id]['year'])
+                new_url = st.text_input("Edit URL", value=paper_links[selected_id])
                 
                 col1, col2 = st.columns(2)
                 with col1:
                     if st.button("Save Changes"):
-                        save_graph_to_json(graph, display_names, paper_info, paper_links, DATA_FILE)
-                        st.success("Changes saved")
+                        # Edits only reach the in-memory graph once confirmed
+                        with edit_graph_state(graph_state) as edit:
+                            # Another session may have deleted the paper meanwhile
+                            paper_exists = selected_id in edit['graph']
+                            if paper_exists:
+                                edit['display_names'][selected_id] = new_title
+                                edit['paper_info'][selected_id].update(author=new_author, pi=new_pi, year=new_year)
+                                edit['paper_links'][selected_id] = new_url
+                                mark_dirty(graph_state)
+                        graph, display_names, paper_info, paper_links, graph_version = read_graph_state(graph_state)
+                        if paper_exists:
+                            st.success("Changes applied; use \"Save to Disk\" to keep them")
+                        else:
+                            st.warning("This paper was deleted in another session; changes not applied")
                 with col2:
                     if st.button("Delete Paper"):
-                        graph.remove_node(selected_id)
-                        display_names.pop(selected_id, None)
-                        paper_info.pop(selected_id, None)
-                        paper_links.pop(selected_id, None)
-                        save_graph_to_json(graph, display_names, paper_info, paper_links, DATA_FILE)
+                        with edit_graph_state(graph_state) as edit:
+                            if selected_id in edit['graph']:
+                                edit['graph'].remove_node(selected_id)
+                                edit['display_names'].pop(selected_id, None)
+                                edit['paper_info'].pop(selected_id, None)
+                                edit['paper_links'].pop(selected_id, None)
+                                mark_dirty(graph_state)
+                        compute_layout.clear()
                         st.success("Paper deleted")
                         st.rerun()
         else:
             st.info("No papers available to edit")
 
+    # Edits are batched in memory; write the whole file only on request, in
+    # the background, so the in-memory graph stays current without a reload
+    if graph_state['dirty']:
+        st.warning("You have unsaved changes")
+        if st.button("Save to Disk"):
+            save_graph_state(graph_state, DATA_FILE)
+            st.rerun()
+
     # Graph Display Settings
     st.header("Graph Settings")
     layout_choice = st.radio("Layout", ["spring", "circular", "kamada-kawai", "random", "fruchterman-reingold"])
@@ -513,7 +796,7 @@ with st.sidebar:
 if graph.number_of_nodes() == 0:
     st.info("No papers in the graph. Add papers using the sidebar controls.")
 else:
-    fig = draw_graph_plotly(graph, display_names, paper_info, layout_choice, color_mode)
+    fig = draw_graph_plotly(graph, display_names, paper_info, layout_choice, color_mode, graph_version)
     
     # Display the plot
     st.plotly_chart(
@@ -530,21 +813,11 @@ else:
             st.rerun()
 
     # Paper Library Table
-    papers_data = []
-    for paper_id in graph.nodes:
-        papers_data.append({
-            "DOI": paper_id,
-            "Title": display_names.get(paper_id, "Unknown"),
-            "1st Author": paper_info.get(paper_id, {}).get('author', "Unknown"),
-            "PI": paper_info.get(paper_id, {}).get('pi', "Unknown"),
-            "Year": paper_info.get(paper_id, {}).get('year', "Unknown"),
-            "Link": paper_links.get(paper_id, "N/A")
-        })
+    df = build_papers_df(graph.nodes(), display_names, paper_info, paper_links)
 
-    if papers_data:
-        df = pd.DataFrame(papers_data)
-        # Create decade from Year column
-        df["Decade"] = df["Year"].apply(lambda y: f"{(int(y)//10)*10}s" if str(y).isdigit() else "Unknown")
+    if not df.empty:
+        # Create decade from Year column, placed before Link for display
+        df.insert(5, "Decade", get_decade_labels(get_decades(df["Year"])).astype(STRING_DTYPE))
         
         # Display filters and table
         st.header("Paper Library")
@@ -561,30 +834,20 @@ else:
             decade_filter = st.text_input("Filter by Decade")
 
         # Apply filters
-        filtered_df = df.copy()
-        if title_filter:
-            filtered_df = filtered_df[filtered_df['Title'].str.contains(title_filter, case=False, na=False)]
-        if author_filter:
-            filtered_df = filtered_df[filtered_df['1st Author'].str.contains(author_filter, case=False, na=False)]
-        if pi_filter:
-            filtered_df = filtered_df[filtered_df['PI'].str.contains(pi_filter, case=False, na=False)]
-        if year_filter:
-            filtered_df = filtered_df[filtered_df['Year'].str.contains(year_filter, case=False, na=False)]
-        if decade_filter:
-            filtered_df = filtered_df[filtered_df['Decade'].str.contains(decade_filter, case=False, na=False)]
-
-        # Convert links to HTML
-        filtered_df['Link'] = filtered_df['Link'].apply(
-            lambda url: f'<a href="{url}" target="_blank">Link</a>' if isinstance(url, str) and url and url != "N/A" else ""
-        )
+        filtered_df = filter_papers(df, {
+            'Title': title_filter,
+            '1st Author': author_filter,
+            'PI': pi_filter,
+            'Year': year_filter,
+            'Decade': decade_filter
+        })
 
         # Display table with both First Author and PI
-        filtered_df = filtered_df[['DOI', 'Title', '1st Author', 'PI', 'Year', 'Decade', 'Link']]
-        st.write(filtered_df.to_html(escape=False, index=False), unsafe_allow_html=True)
+        display_paper_table(filtered_df)
 
         # Citation Connections Section
         st.header("Citation Connections")
-        selected_paper = st.selectbox("Select a paper to view its connections", list(graph.nodes()), format_func=lambda x: display_names[x])
+        selected_paper = select_paper("Select a paper to view its connections", get_node_list(graph, graph_version), format_func=lambda x: display_names[x])
 
         if selected_paper:
             # Get citing papers (papers that cite the selected paper)
@@ -593,46 +856,19 @@ else:
             cited_papers = list(graph.successors(selected_paper))
 
             # Create DataFrames for citing and cited papers
-            citing_data = []
-            for paper_id in citing_papers:
-                citing_data.append({
-                    "DOI": paper_id,
-                    "Title": display_names.get(paper_id, "Unknown"),
-                    "1st Author": paper_info.get(paper_id, {}).get('author', "Unknown"),
-                    "PI": paper_info.get(paper_id, {}).get('pi', "Unknown"),
-                    "Year": paper_info.get(paper_id, {}).get('year', "Unknown"),
-                    "Link": paper_links.get(paper_id, "N/A")
-                })
-
-            cited_data = []
-            for paper_id in cited_papers:
-                cited_data.append({
-                    "DOI": paper_id,
-                    "Title": display_names.get(paper_id, "Unknown"),
-                    "1st Author": paper_info.get(paper_id, {}).get('author', "Unknown"),
-                    "PI": paper_info.get(paper_id, {}).get('pi', "Unknown"),
-                    "Year": paper_info.get(paper_id, {}).get('year', "Unknown"),
-                    "Link": paper_links.get(paper_id, "N/A")
-                })
+            citing_df = build_papers_df(citing_papers, display_names, paper_info, paper_links)
+            cited_df = build_papers_df(cited_papers, display_names, paper_info, paper_links)
 
             # Display citation information
             st.subheader(f"Papers citing \"{display_names[selected_paper]}\"")
-            if citing_data:
-                citing_df = pd.DataFrame(citing_data)
-                citing_df['Link'] = citing_df['Link'].apply(
-                    lambda url: f'<a href="{url}" target="_blank">Link</a>' if isinstance(url, str) and url != "N/A" else ""
-                )
-                st.write(citing_df.to_html(escape=False, index=False), unsafe_allow_html=True)
+            if not citing_df.empty:
+                display_paper_table(citing_df)
             else:
                 st.info("No papers cite this paper in the database")
 
             st.subheader(f"Papers cited by \"{display_names[selected_paper]}\"")
-            if cited_data:
-                cited_df = pd.DataFrame(cited_data)
-                cited_df['Link'] = cited_df['Link'].apply(
-                    lambda url: f'<a href="{url}" target="_blank">Link</a>' if isinstance(url, str) and url != "N/A" else ""
-                )
-                st.write(cited_df.to_html(escape=False, index=False), unsafe_allow_html=True)
+            if not cited_df.empty:
+                display_paper_table(cited_df)
             else:
                 st.info("This paper doesn't cite any papers in the database")
 